@@ -0,0 +1,30 @@
+"""
+Gunicorn configuration for multi-worker deployments.
+
+    gunicorn -c gunicorn.conf.py
+
+The app is imported once in the master (preload_app) and workers are forked
+from it, so code and read-only module data are shared copy-on-write.
+Nothing bound to an event loop is created at import time: HTTP clients,
+semaphores and asyncio locks are built in the FastAPI lifespan or lazily on
+first use, i.e. inside each worker after fork.
+
+Note: rate limits and concurrency caps are per worker; scale
+TELEGRAM_SEND_POOL_SIZE / FEISHU_POOL_SIZE down accordingly when running
+many workers against the same bot or app.
+"""
+import multiprocessing
+import os
+from src.config.settings import settings
+
+wsgi_app = "src.main:app"
+worker_class = "uvicorn.workers.UvicornWorker"
+# 与 `python -m src.main` 使用同一份配置（含.env），端口只在settings中定义一次
+bind = f"0.0.0.0:{settings.api_port}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+# 在master中加载应用后再fork worker，共享只读内存页，加快worker启动
+preload_app = True
+
+# 日志由应用内的loguru统一处理
+accesslog = None
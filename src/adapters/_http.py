@@ -0,0 +1,184 @@
+"""
+Shared HTTP connection pool for all platform adapters.
+Feishu and Telegram borrow the same httpx.AsyncClient (HTTP/2, keep-alive)
+so that connections are pooled and multiplexed across the whole process.
+The application may instead inject dedicated per-platform clients built with
+create_client(); the shared pool is then only used as a fallback.
+HTTPAdapterBase carries the client/network-config plumbing both adapters share.
+"""
+import ssl
+from functools import lru_cache
+from typing import Any, Dict, NoReturn, Optional, Tuple, Union
+import httpx
+import orjson
+from loguru import logger
+from ..config.settings import settings
+from ._retry import RetryAfterError, UnrecoverableError
+
+
+# 不可变的请求配置，模块加载时构建一次，避免每次请求重复创建
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# 进程级共享客户端，按 (代理地址, 是否校验SSL, 是否启用HTTP/2) 区分
+_CLIENTS: Dict[Tuple[Optional[str], bool, bool], httpx.AsyncClient] = {}
+
+
+@lru_cache(maxsize=1)
+def _default_ssl_context() -> ssl.SSLContext:
+    """
+    进程内只构建一次SSLContext（加载CA证书开销较大），所有客户端共用。
+
+    使用httpx自身的构建逻辑，保留对SSL_CERT_FILE / SSL_CERT_DIR（如企业内网CA）的支持，
+    未设置时使用certifi证书库。
+    """
+    return httpx.create_ssl_context()
+
+
+def _ssl_verify(verify_ssl: bool) -> Union[ssl.SSLContext, bool]:
+    """返回传给httpx的verify参数：校验时使用共享SSLContext，否则为False。"""
+    return _default_ssl_context() if verify_ssl else False
+
+
+def create_client(proxy: Optional[str], verify_ssl: bool, max_connections: int = 100,
+                  max_keepalive_connections: int = 20,
+                  timeout: Union[float, httpx.Timeout, None] = 30.0,
+                  http2: bool = True) -> httpx.AsyncClient:
+    """
+    创建一个新的httpx.AsyncClient（HTTP/2 + keep-alive连接池），由调用方负责关闭。
+
+    Args:
+        proxy: 代理地址，None表示直连
+        verify_ssl: 是否校验SSL证书
+        max_connections: 连接池最大连接数
+        max_keepalive_connections: 最多保留的空闲keep-alive连接数
+        timeout: 超时配置（秒或httpx.Timeout），None表示不超时（用于长轮询）
+        http2: 是否启用HTTP/2（经ALPN协商，服务端不支持时自动使用HTTP/1.1）
+
+    Returns:
+        httpx.AsyncClient: 新建的客户端
+    """
+    if not verify_ssl:
+        logger.warning("⚠️  SSL certificate verification disabled for outgoing API requests")
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=timeout,
+        verify=_ssl_verify(verify_ssl),
+        proxy=proxy,
+        # httpx默认空闲连接5秒即回收，通知流量间歇性强，保持75秒（与常见服务端keep-alive一致）
+        # 避免空闲后每次发送都重新进行TCP+TLS握手
+        limits=httpx.Limits(max_connections=max_connections,
+                            max_keepalive_connections=max_keepalive_connections,
+                            keepalive_expiry=75.0)
+    )
+
+
+def get_client(proxy: Optional[str], verify_ssl: bool, http2: bool = True) -> httpx.AsyncClient:
+    """
+    获取进程级共享的httpx.AsyncClient，首次调用时创建。
+
+    Args:
+        proxy: 代理地址，None表示直连
+        verify_ssl: 是否校验SSL证书
+        http2: 是否启用HTTP/2
+
+    Returns:
+        httpx.AsyncClient: 共享客户端（HTTP/2多路复用 + 连接池）
+    """
+    key = (proxy, verify_ssl, http2)
+    client = _CLIENTS.get(key)
+    if client is None or client.is_closed:
+        client = create_client(proxy, verify_ssl, http2=http2)
+        _CLIENTS[key] = client
+        logger.debug("Created shared HTTP client (proxy={}, ssl={}, http2={})", bool(proxy), verify_ssl, http2)
+    return client
+
+
+async def close_clients():
+    """Close all shared clients. Called once on application shutdown."""
+    for client in _CLIENTS.values():
+        if not client.is_closed:
+            await client.aclose()
+    _CLIENTS.clear()
+
+
+def decode_json(response: httpx.Response) -> Dict[str, Any]:
+    """
+    使用orjson解析响应体（比标准库json快，且直接处理bytes）。
+
+    Raises:
+        Exception: 响应体不是合法JSON时（如代理返回的HTML错误页），可重试
+    """
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        # orjson.JSONDecodeError 是 ValueError 的子类，需转换以免被当作参数错误而不重试
+        raise Exception(f"Invalid JSON response (HTTP {response.status_code})")
+
+
+def raise_for_upstream_error(response: httpx.Response, error: str,
+                             retry_after: Optional[float] = None) -> NoReturn:
+    """
+    按上游错误响应的状态码抛出对应异常，决定是否重试（各适配器共用的唯一分类逻辑）。
+
+    Args:
+        response: 上游的失败响应
+        error: 异常信息
+        retry_after: 上游给出的限流等待时间（秒），仅对429生效
+
+    Raises:
+        RetryAfterError: 429且给出了等待时间，按该时间重试
+        UnrecoverableError: 其余4xx为请求本身错误，重试无意义
+        Exception: 5xx、无等待时间的429等，按退避策略重试
+    """
+    status = response.status_code
+    if status == 429 and retry_after is not None:
+        raise RetryAfterError(error, max(retry_after, 0.0))
+    if 400 <= status < 500 and status != 429:
+        raise UnrecoverableError(error)
+    raise Exception(error)
+
+
+class HTTPAdapterBase:
+    """平台适配器公共的HTTP客户端管理：网络配置快照、共享客户端与专用客户端创建。"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None  # 共享的HTTP客户端，首次使用时获取
+        self._load_network_config()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        获取进程级共享的httpx客户端（按当前代理/SSL配置选择）。
+
+        Returns:
+            httpx.AsyncClient: 共享客户端（HTTP/2多路复用 + 连接池），由close_clients()统一关闭
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = get_client(self._proxy, self._ssl, self._http2)
+        return self._client
+
+    def create_client(self, max_connections: int = 32,
+                      timeout: Union[float, httpx.Timeout, None] = 30.0) -> httpx.AsyncClient:
+        """
+        为该平台创建专用的httpx客户端（使用当前代理/SSL配置），由调用方负责关闭。
+
+        Args:
+            max_connections: 连接池大小，同时作为keep-alive连接上限
+            timeout: 超时配置（秒或httpx.Timeout），None表示不超时
+
+        Returns:
+            httpx.AsyncClient: 可通过client参数注入到send_message的客户端
+        """
+        return create_client(self._proxy, self._ssl, max_connections=max_connections,
+                             max_keepalive_connections=max_connections, timeout=timeout,
+                             http2=self._http2)
+
+    def _load_network_config(self):
+        """读取代理、SSL与HTTP/2配置快照，启动后视为不可变，避免每次请求重复读取settings。"""
+        self._proxy: Optional[str] = settings.https_proxy or settings.http_proxy or None
+        self._ssl: bool = settings.verify_ssl
+        self._http2: bool = settings.http2_enabled
+
+    def refresh_config(self):
+        """Re-read proxy/SSL/HTTP2 settings and pick the matching HTTP client on next use."""
+        self._client = None
+        self._load_network_config()
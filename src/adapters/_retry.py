@@ -0,0 +1,85 @@
+"""
+Shared async retry helper for platform adapters.
+Exponential backoff with jitter and a delay cap; client errors that can never
+succeed on retry are raised immediately.
+"""
+import asyncio
+import functools
+import random
+from typing import Any, Callable
+from loguru import logger
+
+
+class UnrecoverableError(Exception):
+    """请求错误无法通过重试恢复（如4xx参数错误），应立即返回给调用方。"""
+
+
+class RetryAfterError(Exception):
+    """上游限流（429）并给出了建议等待时间，下次重试按该时间等待而不是按退避序列。"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _is_unrecoverable(exc: Exception) -> bool:
+    """判断异常是否不值得重试：参数错误，以及适配器已判定为不可恢复的响应（除429外的4xx）。"""
+    return isinstance(exc, (UnrecoverableError, ValueError))
+
+
+async def retry_async(func: Callable, *args: Any, max_retries: int = 3, base_delay: float = 1.0,
+                      max_delay: float = 30.0, jitter: float = 0.5, **kwargs: Any) -> Any:
+    """
+    异步重试函数，支持带抖动和上限的指数退避策略。
+
+    Args:
+        func: 要重试的异步函数，每次尝试以 func(*args, **kwargs) 调用
+        max_retries: 最大重试次数，默认3次
+        base_delay: 基础延迟时间（秒），默认1秒
+        max_delay: 单次延迟上限（秒），默认30秒；上游要求的retry_after超过该值时直接失败
+        jitter: 抖动比例，实际延迟在 delay * (1 ± jitter) 范围内随机
+
+    Returns:
+        函数执行结果
+
+    Raises:
+        最后一次尝试的异常，或不可恢复的异常（不重试）
+    """
+    for attempt in range(max_retries + 1):  # +1 因为第一次不算重试
+        try:
+            return await func(*args, **kwargs)
+        except Exception as e:
+            if attempt == max_retries or _is_unrecoverable(e):
+                raise
+
+            if isinstance(e, RetryAfterError):
+                # 早于retry_after重试只会再次被限流；等待超过上限时不占着请求，直接失败
+                if e.retry_after > max_delay:
+                    raise
+                delay = e.retry_after
+            else:
+                # 指数退避：约1s, 2s, 4s（带随机抖动，避免多个请求同步重试）
+                delay = min(max_delay, base_delay * (2 ** attempt)) * (1 + random.uniform(-jitter, jitter))
+            logger.warning(f"Attempt {attempt + 1} failed: {str(e)}, retrying in {delay:.2f}s...")
+            await asyncio.sleep(delay)
+
+
+def retry(max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 30.0,
+          jitter: float = 0.5) -> Callable:
+    """
+    重试装饰器：被装饰的异步函数调用时自动按 retry_async 的策略重试。
+
+    调用参数直接透传给每次尝试，调用方无需再为每个请求创建闭包。
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await retry_async(func, *args, max_retries=max_retries, base_delay=base_delay,
+                                     max_delay=max_delay, jitter=jitter, **kwargs)
+        return wrapper
+    return decorator
+
+
+# 适配器上游请求的统一策略：超时、连接中断、5xx与429按约0.5s/1s/2s退避重试，其余4xx直接失败；
+# 429带retry_after时按其等待，超过10秒则直接失败
+upstream_retry = retry(max_retries=3, base_delay=0.5, max_delay=10.0)
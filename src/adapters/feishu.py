@@ -5,59 +5,125 @@ Implements the two-step authentication and messaging process:
 2. Send message to user/group
 """
 import asyncio
-import aiohttp
-import re
-from typing import Optional, Dict, Any, Callable
+import time
+import httpx
+import orjson
+from typing import Optional, Dict, Any, List, Tuple, Union
 from loguru import logger
-from ..config.settings import settings
+from ._http import HTTPAdapterBase, JSON_HEADERS, decode_json, raise_for_upstream_error
+from ._retry import upstream_retry
 
 
-async def retry_async_feishu(func: Callable, max_retries: int = 3, base_delay: float = 1.0) -> Any:
+def _ratelimit_reset(response: httpx.Response) -> Optional[float]:
+    """读取限流响应头x-ogw-ratelimit-reset（距配额重置的秒数），缺失或无法解析时返回None。"""
+    try:
+        return float(response.headers["x-ogw-ratelimit-reset"])
+    except (KeyError, ValueError):
+        return None
+
+
+@upstream_retry
+async def _feishu_get_token(client: httpx.AsyncClient, url: str, body: bytes) -> Dict[str, Any]:
+    """
+    请求Feishu tenant access token（自动重试）。
+    
+    Returns:
+        dict: 包含tenant_access_token和expire的Feishu响应
     """
-    异步重试装饰器，专为Feishu API设计，支持指数退避策略。
+    try:
+        response = await client.post(url, content=body, headers=JSON_HEADERS)
+    except httpx.HTTPError as e:
+        logger.error(f"Network error getting Feishu token: {str(e)}")
+        raise Exception(f"Network error: {str(e)}")
     
-    Args:
-        func: 要重试的异步函数
-        max_retries: 最大重试次数，默认3次
-        base_delay: 基础延迟时间（秒），默认1秒
+    result = decode_json(response)
+    if response.status_code == 200 and result.get("code") == 0 and result.get("tenant_access_token"):
+        return result
+    
+    error_msg = result.get("msg", "Unknown error")
+    logger.error(f"Failed to get Feishu access token: {error_msg}")
+    raise_for_upstream_error(response, f"Feishu auth error: {error_msg}", _ratelimit_reset(response))
+
+
+@upstream_retry
+async def _feishu_post(client: httpx.AsyncClient, url: str, body: bytes,
+                       headers: Dict[str, str]) -> Dict[str, Any]:
+    """
+    发送一条已序列化的Feishu消息（自动重试）。
     
     Returns:
-        函数执行结果
-        
-    Raises:
-        最后一次尝试的异常
+        dict: API response from Feishu
     """
-    last_exception = None
+    try:
+        response = await client.post(url, content=body, headers=headers)
+    except httpx.HTTPError as e:
+        logger.error(f"Network error sending Feishu message: {str(e)}")
+        raise Exception(f"Network error: {str(e)}")
     
-    for attempt in range(max_retries + 1):  # +1 因为第一次不算重试
-        try:
-            return await func()
-        except Exception as e:
-            last_exception = e
-            if attempt == max_retries:  # 最后一次尝试失败
-                raise e
-            
-            # 指数退避：1s, 2s, 4s
-            delay = base_delay * (2 ** attempt)
-            logger.warning(f"Feishu API attempt {attempt + 1} failed: {str(e)}, retrying in {delay}s...")
-            await asyncio.sleep(delay)
+    result = decode_json(response)
+    if response.status_code == 200 and result.get("code") == 0:
+        return result
+    
+    error_msg = result.get("msg", "Unknown error")
+    logger.error(f"Failed to send Feishu message: {error_msg}")
+    raise_for_upstream_error(response, f"Feishu API error: {error_msg}", _ratelimit_reset(response))
+
+
+class _FeishuTokenCache:
+    """单个应用凭证的tenant access token缓存：按TTL过期，刷新时由锁保证只请求一次。"""
+    
+    __slots__ = ("token", "expires_at", "_lock")
+    
+    def __init__(self):
+        self.token: Optional[str] = None
+        self.expires_at: float = 0.0  # 过期时间点（time.monotonic()）
+        self._lock: Optional[asyncio.Lock] = None  # 首次刷新时创建，确保绑定到运行中的事件循环
     
-    # 这行代码理论上不会执行到，但为了类型安全
-    raise last_exception
+    @property
+    def lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+    
+    @property
+    def refreshing(self) -> bool:
+        """是否有协程正在刷新该token。"""
+        return self._lock is not None and self._lock.locked()
+    
+    def get(self) -> Optional[str]:
+        """返回未过期的token，不存在或已过期时返回None。"""
+        if self.token and self.expires_at > time.monotonic():
+            return self.token
+        return None
+    
+    def set(self, token: str, ttl: float):
+        """缓存token，ttl秒后过期。"""
+        self.token = token
+        self.expires_at = time.monotonic() + ttl
 
 
-class FeishuAdapter:
+class FeishuAdapter(HTTPAdapterBase):
     """Adapter for sending messages via Feishu Open API."""
     
     AUTH_URL = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
     MESSAGE_URL = "https://open.feishu.cn/open-apis/im/v1/messages"
     
+    # Feishu未返回expire时的默认有效期（秒），以及提前刷新的安全余量
+    DEFAULT_TOKEN_TTL = 7200
+    TOKEN_REFRESH_MARGIN = 300
+    
+    # 批量发送时的最大并发数
+    SEND_CONCURRENCY = 20
+    
     def __init__(self):
         """Initialize Feishu adapter."""
-        self._token_cache = {}  # Simple in-memory token cache
+        # token缓存: (app_id, app_secret) -> 该凭证的token缓存
+        self._token_cache: Dict[Tuple[str, str], _FeishuTokenCache] = {}
+        self._send_url = f"{self.MESSAGE_URL}?receive_id_type=user_id"
+        super().__init__()
     
     @staticmethod
-    def _is_valid_user_id(user_id: str) -> bool:
+    def is_valid_user_id(user_id: str) -> bool:
         """
         验证用户ID是否为有效格式。
         Feishu要求用户ID为64位数字格式。
@@ -68,19 +134,19 @@ class FeishuAdapter:
         Returns:
             bool: 如果是有效的用户ID格式则返回True
         """
-        if not user_id:
-            return False
-        
         # 检查是否为纯数字且长度合理（通常为19位左右的数字）
-        return re.match(r'^\d{10,20}$', user_id) is not None
+        # 使用 isascii + isdigit 代替正则匹配，仅接受ASCII数字
+        return bool(user_id) and 10 <= len(user_id) <= 20 and user_id.isascii() and user_id.isdigit()
     
-    async def _get_access_token(self, app_id: str, app_secret: str) -> str:
+    async def _get_access_token(self, app_id: str, app_secret: str,
+                                client: Optional[httpx.AsyncClient] = None) -> str:
         """
         Get tenant access token from Feishu API with proxy support and retry mechanism.
         
         Args:
             app_id: Feishu application ID
             app_secret: Feishu application secret
+            client: 注入的HTTP客户端，None时使用共享客户端
             
         Returns:
             str: Access token
@@ -88,76 +154,50 @@ class FeishuAdapter:
         Raises:
             Exception: If token retrieval fails after retries
         """
-        # Check cache first (simple implementation - no expiration handling for now)
-        cache_key = f"{app_id}:{app_secret[:8]}..."
-        if cache_key in self._token_cache:
-            logger.debug("Using cached Feishu access token")
-            return self._token_cache[cache_key]
-        
-        payload = {
-            "app_id": app_id,
-            "app_secret": app_secret
-        }
-        
-        logger.info("Requesting Feishu access token")
+        cache_key = (app_id, app_secret)
+        cache = self._token_cache.get(cache_key)
+        if cache is None:
+            cache = self._token_cache[cache_key] = _FeishuTokenCache()
         
-        # 配置代理设置
-        proxy = None
-        if settings.https_proxy:
-            proxy = settings.https_proxy
-            logger.debug(f"Using HTTPS proxy for Feishu auth: {proxy}")
-        elif settings.http_proxy:
-            proxy = settings.http_proxy
-            logger.debug(f"Using HTTP proxy for Feishu auth: {proxy}")
+        # 快速路径：缓存命中时直接返回，无需加锁
+        token = cache.get()
+        if token:
+            logger.debug("Using cached Feishu access token")
+            return token
         
-        async def _get_token():
-            """内部获取token函数，支持重试机制"""
-            connector = None
+        # single-flight：同一凭证同时只允许一个协程刷新token
+        async with cache.lock:
+            # 二次检查：等待锁期间，先到的协程可能已经完成刷新
+            token = cache.get()
+            if token:
+                return token
+            
+            self.prune_expired()
+            logger.info("Requesting Feishu access token")
+            
+            body = orjson.dumps({
+                "app_id": app_id,
+                "app_secret": app_secret
+            })
+            
+            # 使用重试机制获取token
             try:
-                # 配置连接器 - 支持代理和SSL验证设置
-                ssl_context = settings.verify_ssl if hasattr(settings, 'verify_ssl') else True
-                if proxy or not ssl_context:
-                    connector = aiohttp.TCPConnector(ssl=ssl_context)
-                    if not ssl_context:
-                        logger.warning("⚠️  Feishu API: SSL certificate verification disabled for token request")
-                
-                timeout = aiohttp.ClientTimeout(total=30)  # 30秒超时
-                async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                    async with session.post(self.AUTH_URL, json=payload, proxy=proxy) as response:
-                        result = await response.json()
-                        
-                        if response.status == 200 and result.get("code") == 0:
-                            token = result.get("tenant_access_token")
-                            if token:
-                                # Cache the token (simple implementation)
-                                self._token_cache[cache_key] = token
-                                logger.success("Feishu access token obtained successfully")
-                                return token
-                        
-                        error_msg = result.get("msg", "Unknown error")
-                        logger.error(f"Failed to get Feishu access token: {error_msg}")
-                        raise Exception(f"Feishu auth error: {error_msg}")
-                        
-            except aiohttp.ClientError as e:
-                logger.error(f"Network error getting Feishu token: {str(e)}")
-                raise Exception(f"Network error: {str(e)}")
+                result = await _feishu_get_token(client or self._get_client(), self.AUTH_URL, body)
             except Exception as e:
-                logger.error(f"Unexpected error getting Feishu token: {str(e)}")
+                logger.error(f"Could not get Feishu token: {str(e)}")
                 raise
-            finally:
-                if connector:
-                    await connector.close()
-        
-        # 使用重试机制获取token
-        try:
-            return await retry_async_feishu(_get_token, max_retries=3, base_delay=1.0)
-        except Exception as e:
-            logger.error(f"All retry attempts failed for Feishu token: {str(e)}")
-            raise
+            
+            # 按Feishu返回的expire缓存token，并预留安全余量提前刷新
+            token = result["tenant_access_token"]
+            expire = int(result.get("expire", self.DEFAULT_TOKEN_TTL))
+            cache.set(token, expire - self.TOKEN_REFRESH_MARGIN)
+            logger.success(f"Feishu access token obtained successfully (expires in {expire}s)")
+            return token
     
     async def send_message(self, app_id: str, app_secret: str, message: str, 
                           receive_id: Optional[str] = None, 
-                          default_user_id: Optional[str] = None) -> Dict[str, Any]:
+                          default_user_id: Optional[str] = None,
+                          client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
         """
         Send a text message via Feishu API.
         
@@ -167,6 +207,7 @@ class FeishuAdapter:
             message: Message text to send
             receive_id: Target user/group ID. 如果为None，将尝试使用default_user_id
             default_user_id: 默认用户ID（从配置中获取）
+            client: 注入的HTTP客户端（如应用lifespan中创建的专用客户端），None时使用共享客户端
             
         Returns:
             dict: API response from Feishu
@@ -182,15 +223,15 @@ class FeishuAdapter:
         target_receive_id = None
         
         if receive_id:
-            if self._is_valid_user_id(receive_id):
+            if self.is_valid_user_id(receive_id):
                 target_receive_id = receive_id
-                logger.info(f"Using provided receive_id: {receive_id}")
+                logger.debug("Using provided receive_id: {}", receive_id)
             else:
                 raise ValueError(f"Invalid receive_id format: '{receive_id}'. Must be 10-20 digit number (e.g., 6421712345678901234)")
         elif default_user_id:
-            if self._is_valid_user_id(default_user_id):
+            if self.is_valid_user_id(default_user_id):
                 target_receive_id = default_user_id
-                logger.info(f"Using default user ID from configuration: {default_user_id}")
+                logger.debug("Using default user ID from configuration: {}", default_user_id)
             else:
                 raise ValueError(f"Invalid default_user_id format in configuration: '{default_user_id}'. Must be 10-20 digit number")
         else:
@@ -200,81 +241,111 @@ class FeishuAdapter:
                 "User ID must be 10-20 digit number format (e.g., 6421712345678901234)"
             )
         
+        client = client or self._get_client()
+        
         # Step 1: Get access token
-        access_token = await self._get_access_token(app_id, app_secret)
+        access_token = await self._get_access_token(app_id, app_secret, client)
         
         # Step 2: Send message
-        url = f"{self.MESSAGE_URL}?receive_id_type=user_id"
+        return await self._post_message(access_token, message, target_receive_id, client)
+    
+    async def send_messages(self, app_id: str, app_secret: str, message: str,
+                            receive_ids: List[str],
+                            client: Optional[httpx.AsyncClient] = None) -> List[Union[Dict[str, Any], BaseException]]:
+        """
+        Send the same text message to multiple Feishu users concurrently.
+        
+        Args:
+            app_id: Feishu application ID
+            app_secret: Feishu application secret
+            message: Message text to send
+            receive_ids: 目标用户ID列表（10-20位数字格式）
+            client: 注入的HTTP客户端，None时使用共享客户端
+            
+        Returns:
+            list: 与receive_ids一一对应的结果，成功为Feishu API响应，失败为对应的异常对象
+            
+        Raises:
+            ValueError: If app_id or app_secret is missing
+            Exception: If access token retrieval fails
+        """
+        if not app_id or not app_secret:
+            raise ValueError("Feishu app_id and app_secret are required")
+        
+        client = client or self._get_client()
+        
+        # 只获取一次token，所有接收方共用
+        access_token = await self._get_access_token(app_id, app_secret, client)
+        
+        # 信号量限制并发，避免触发Feishu单应用的频率限制
+        semaphore = asyncio.Semaphore(self.SEND_CONCURRENCY)
+        
+        async def _send_one(receive_id: str) -> Dict[str, Any]:
+            if not self.is_valid_user_id(receive_id):
+                raise ValueError(f"Invalid receive_id format: '{receive_id}'. Must be 10-20 digit number")
+            async with semaphore:
+                return await self._post_message(access_token, message, receive_id, client)
+        
+        logger.info(f"Sending Feishu message to {len(receive_ids)} recipients")
+        return await asyncio.gather(*(_send_one(rid) for rid in receive_ids), return_exceptions=True)
+    
+    async def _post_message(self, access_token: str, message: str, receive_id: str,
+                            client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
+        """
+        使用已获取的access token发送一条文本消息（含重试机制）。
+        
+        Args:
+            access_token: Feishu tenant access token
+            message: Message text to send
+            receive_id: 已校验的目标用户ID
+            client: 注入的HTTP客户端，None时使用共享客户端
+            
+        Returns:
+            dict: API response from Feishu
+        """
         headers = {
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json"
         }
         
-        payload = {
-            "receive_id": target_receive_id,
+        body = orjson.dumps({
+            "receive_id": receive_id,
             "msg_type": "text",
             "content": {
                 "text": message
             }
-        }
-        
-        logger.info(f"Sending Feishu message to {target_receive_id}")
-        logger.debug(f"Message content: {message[:100]}...")
+        })
         
-        # 配置代理设置
-        proxy = None
-        if settings.https_proxy:
-            proxy = settings.https_proxy
-            logger.debug(f"Using HTTPS proxy for Feishu message: {proxy}")
-        elif settings.http_proxy:
-            proxy = settings.http_proxy
-            logger.debug(f"Using HTTP proxy for Feishu message: {proxy}")
-        
-        async def _send_request():
-            """内部发送消息函数，支持重试机制"""
-            connector = None
-            try:
-                # 配置连接器 - 支持代理和SSL验证设置
-                ssl_context = settings.verify_ssl if hasattr(settings, 'verify_ssl') else True
-                if proxy or not ssl_context:
-                    connector = aiohttp.TCPConnector(ssl=ssl_context)
-                    if not ssl_context:
-                        logger.warning("⚠️  Feishu API: SSL certificate verification disabled for message request")
-                
-                timeout = aiohttp.ClientTimeout(total=30)  # 30秒超时
-                async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                    async with session.post(url, json=payload, headers=headers, proxy=proxy) as response:
-                        result = await response.json()
-                        
-                        if response.status == 200 and result.get("code") == 0:
-                            logger.success(f"Message sent successfully to Feishu user {target_receive_id}")
-                            return result
-                        else:
-                            error_msg = result.get("msg", "Unknown error")
-                            logger.error(f"Failed to send Feishu message: {error_msg}")
-                            raise Exception(f"Feishu API error: {error_msg}")
-                            
-            except aiohttp.ClientError as e:
-                logger.error(f"Network error sending Feishu message: {str(e)}")
-                raise Exception(f"Network error: {str(e)}")
-            except Exception as e:
-                logger.error(f"Unexpected error sending Feishu message: {str(e)}")
-                raise
-            finally:
-                if connector:
-                    await connector.close()
+        logger.opt(lazy=True).debug("Message content: {}...", lambda: message[:100])
         
         # 使用重试机制发送消息
+        started = time.perf_counter()
         try:
-            return await retry_async_feishu(_send_request, max_retries=3, base_delay=1.0)
+            result = await _feishu_post(client or self._get_client(), self._send_url, body, headers)
         except Exception as e:
-            logger.error(f"All retry attempts failed for Feishu message: {str(e)}")
+            logger.error(f"Feishu message not sent: {str(e)}")
             raise
+        
+        logger.success(
+            "Feishu message sent to {receive_id} in {ms:.1f}ms",
+            platform="feishu", receive_id=receive_id, ms=(time.perf_counter() - started) * 1000
+        )
+        return result
     
     def clear_token_cache(self):
         """Clear the access token cache."""
         self._token_cache.clear()
         logger.info("Feishu token cache cleared")
+    
+    def prune_expired(self):
+        """Remove expired tokens from the cache (entries being refreshed are kept)."""
+        now = time.monotonic()
+        expired = [key for key, cache in self._token_cache.items()
+                   if cache.expires_at <= now and not cache.refreshing]
+        for key in expired:
+            del self._token_cache[key]
+        if expired:
+            logger.debug("Pruned {} expired Feishu token(s)", len(expired))
 
 
 # Global feishu adapter instance
@@ -2,48 +2,42 @@
 Telegram Bot API adapter for sending messages to Telegram groups.
 Uses the official Telegram Bot API to send text messages.
 """
-import asyncio
-import aiohttp
-from typing import Optional, Callable, Any
+import time
+import httpx
+import orjson
+from typing import Any, Dict, Optional
 from loguru import logger
 from ..config.settings import settings
+from ._http import HTTPAdapterBase, JSON_HEADERS, decode_json, raise_for_upstream_error
+from ._retry import upstream_retry
 
 
-async def retry_async(func: Callable, max_retries: int = 3, base_delay: float = 1.0) -> Any:
+@upstream_retry
+async def _telegram_post(client: httpx.AsyncClient, url: str, body: bytes) -> Dict[str, Any]:
     """
-    异步重试装饰器，支持指数退避策略。
-    
-    Args:
-        func: 要重试的异步函数
-        max_retries: 最大重试次数，默认3次
-        base_delay: 基础延迟时间（秒），默认1秒
+    发送一条已序列化的Telegram消息（自动重试）。
     
     Returns:
-        函数执行结果
-        
-    Raises:
-        最后一次尝试的异常
+        dict: API response from Telegram
     """
-    last_exception = None
+    try:
+        response = await client.post(url, content=body, headers=JSON_HEADERS)
+    except httpx.HTTPError as e:
+        logger.error(f"Network error sending Telegram message: {str(e)}")
+        raise Exception(f"Network error: {str(e)}")
     
-    for attempt in range(max_retries + 1):  # +1 因为第一次不算重试
-        try:
-            return await func()
-        except Exception as e:
-            last_exception = e
-            if attempt == max_retries:  # 最后一次尝试失败
-                raise e
-            
-            # 指数退避：1s, 2s, 4s
-            delay = base_delay * (2 ** attempt)
-            logger.warning(f"Attempt {attempt + 1} failed: {str(e)}, retrying in {delay}s...")
-            await asyncio.sleep(delay)
+    result = decode_json(response)
+    if response.status_code == 200 and result.get("ok"):
+        return result
     
-    # 这行代码理论上不会执行到，但为了类型安全
-    raise last_exception
+    error_msg = result.get("description", "Unknown error")
+    logger.error(f"Failed to send Telegram message: {error_msg}")
+    retry_after = (result.get("parameters") or {}).get("retry_after")
+    raise_for_upstream_error(response, f"Telegram API error: {error_msg}",
+                             float(retry_after) if retry_after is not None else None)
 
 
-class TelegramAdapter:
+class TelegramAdapter(HTTPAdapterBase):
     """Adapter for sending messages to Telegram groups via Bot API."""
     
     def __init__(self, bot_token: Optional[str] = None):
@@ -59,14 +53,18 @@ class TelegramAdapter:
             raise ValueError("Telegram bot token is required")
         
         self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
+        self._send_url = f"{self.base_url}/sendMessage"  # 预先拼接，避免每次发送重复格式化
+        super().__init__()
     
-    async def send_message(self, text: str, group_id: Optional[int] = None) -> dict:
+    async def send_message(self, text: str, group_id: Optional[int] = None,
+                           client: Optional[httpx.AsyncClient] = None) -> dict:
         """
         Send a text message to a Telegram group with proxy support and retry mechanism.
         
         Args:
             text: Message text to send
             group_id: Target group ID. If None, uses default from settings
+            client: 注入的HTTP客户端（如应用lifespan中创建的专用客户端），None时使用共享客户端
             
         Returns:
             dict: API response from Telegram
@@ -76,64 +74,30 @@ class TelegramAdapter:
         """
         target_group = group_id or settings.telegram_default_group_id
         
-        url = f"{self.base_url}/sendMessage"
-        payload = {
+        # 使用orjson一次性序列化请求体，避免HTTP客户端内部再调用标准库json.dumps
+        body = orjson.dumps({
             "chat_id": target_group,
             "text": text,
             "parse_mode": "HTML"  # Support basic HTML formatting
-        }
-        
-        logger.info(f"Sending Telegram message to group {target_group}")
-        logger.debug(f"Message content: {text[:100]}...")
+        })
         
-        # 配置代理设置
-        proxy = None
-        if settings.https_proxy:
-            proxy = settings.https_proxy
-            logger.debug(f"Using HTTPS proxy for Telegram API: {proxy}")
-        elif settings.http_proxy:
-            proxy = settings.http_proxy
-            logger.debug(f"Using HTTP proxy for Telegram API: {proxy}")
-        
-        async def _send_request():
-            """内部发送请求函数，支持重试机制"""
-            connector = None
-            try:
-                # 配置连接器 - 支持代理和SSL验证设置
-                ssl_context = settings.verify_ssl if hasattr(settings, 'verify_ssl') else True
-                if proxy or not ssl_context:
-                    connector = aiohttp.TCPConnector(ssl=ssl_context)
-                    if not ssl_context:
-                        logger.warning("⚠️  Telegram API: SSL certificate verification disabled")
-                
-                timeout = aiohttp.ClientTimeout(total=30)  # 30秒超时
-                async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                    async with session.post(url, json=payload, proxy=proxy) as response:
-                        result = await response.json()
-                        
-                        if response.status == 200 and result.get("ok"):
-                            logger.success(f"Message sent successfully to Telegram group {target_group}")
-                            return result
-                        else:
-                            error_msg = result.get("description", "Unknown error")
-                            logger.error(f"Failed to send Telegram message: {error_msg}")
-                            raise Exception(f"Telegram API error: {error_msg}")
-            except aiohttp.ClientError as e:
-                logger.error(f"Network error sending Telegram message: {str(e)}")
-                raise Exception(f"Network error: {str(e)}")
-            except Exception as e:
-                logger.error(f"Unexpected error sending Telegram message: {str(e)}")
-                raise
-            finally:
-                if connector:
-                    await connector.close()
+        # lazy=True：仅在DEBUG级别实际输出时才执行切片和格式化
+        logger.opt(lazy=True).debug("Message content: {}...", lambda: text[:100])
         
         # 使用重试机制发送消息
+        started = time.perf_counter()
         try:
-            return await retry_async(_send_request, max_retries=3, base_delay=1.0)
+            result = await _telegram_post(client or self._get_client(), self._send_url, body)
         except Exception as e:
-            logger.error(f"All retry attempts failed for Telegram message: {str(e)}")
+            logger.error(f"Telegram message not sent: {str(e)}")
             raise
+        
+        # 每次发送只输出一条结构化日志（字段同时写入record["extra"]）
+        logger.success(
+            "Telegram message sent to group {group_id} in {ms:.1f}ms",
+            platform="telegram", group_id=target_group, ms=(time.perf_counter() - started) * 1000
+        )
+        return result
     
     def validate_config(self) -> bool:
         """
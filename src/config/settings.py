@@ -5,51 +5,98 @@ Configuration management system with multi-layer priority:
 3. env_for_docker defaults (lowest priority)
 """
 import os
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional
 from dotenv import load_dotenv
 
 
+# 布尔型环境变量视为True的取值
+_TRUE_VALUES = frozenset({"true", "1", "yes", "on"})
+
+# 环境文件只在进程内解析一次，重复创建Settings（如测试中）时跳过
+_DOTENV_LOADED = False
+
+
+def _load_env_files():
+    """
+    Load environment files in reverse priority order (once per process).
+    Later loaded files override earlier ones; missing files are skipped.
+    """
+    global _DOTENV_LOADED
+    if _DOTENV_LOADED:
+        return
+    if Path("env_for_docker").is_file():
+        load_dotenv("env_for_docker", override=False)  # Lowest priority
+    if Path(".env").is_file():
+        load_dotenv(".env", override=True)  # Highest priority
+    _DOTENV_LOADED = True
+
+
 class Settings:
     """Application settings with multi-layer configuration support."""
     
     def __init__(self):
-        # Load environment files in reverse priority order
-        # Later loaded files override earlier ones
-        load_dotenv("env_for_docker", override=False)  # Lowest priority
-        load_dotenv(".env", override=True)  # Highest priority
+        _load_env_files()
+        env = os.environ
         
         # API Configuration
-        self.api_port = int(os.getenv("API_PORT", "18888"))
-        self.log_level = os.getenv("LOG_LEVEL", "INFO")
+        self.api_port = int(env.get("API_PORT", "18888"))
+        self.log_level = env.get("LOG_LEVEL", "INFO")
+        # 关闭文件日志（测试或只读文件系统环境）
+        self.disable_file_log = env.get("DISABLE_FILE_LOG", "false").lower() in _TRUE_VALUES
+        # uvicorn使用uvloop事件循环与httptools解析器（Windows上始终回退到asyncio/h11）
+        self.fast_io = env.get("FAST_IO", "true").lower() in _TRUE_VALUES
         
         # Telegram Configuration
-        self.telegram_bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
-        self.telegram_default_group_id = int(os.getenv("TELEGRAM_DEFAULT_GROUP_ID", "-868155406"))
+        self.telegram_bot_token = env.get("TELEGRAM_BOT_TOKEN")
+        self.telegram_default_group_id = int(env.get("TELEGRAM_DEFAULT_GROUP_ID", "-868155406"))
+        # Telegram发送专用连接池大小，以及等待空闲连接的超时时间（秒）
+        self.telegram_send_pool_size = int(env.get("TELEGRAM_SEND_POOL_SIZE", "32"))
+        self.telegram_pool_timeout = float(env.get("TELEGRAM_POOL_TIMEOUT", "10"))
         
         # Feishu Configuration
-        self.feishu_app_id = os.getenv("FEISHU_APP_ID")
-        self.feishu_app_secret = os.getenv("FEISHU_APP_SECRET")
-        self.feishu_default_user_id = os.getenv("FEISHU_DEFAULT_USER_ID")
+        self.feishu_app_id = env.get("FEISHU_APP_ID")
+        self.feishu_app_secret = env.get("FEISHU_APP_SECRET")
+        self.feishu_default_user_id = env.get("FEISHU_DEFAULT_USER_ID")
+        # 飞书API连接池大小（同时作为并发发送上限）
+        self.feishu_pool_size = int(env.get("FEISHU_POOL_SIZE", "32"))
         
         # 代理配置 - 支持企业网络环境和防火墙
-        self.http_proxy = os.getenv('HTTP_PROXY') or os.getenv('http_proxy')
-        self.https_proxy = os.getenv('HTTPS_PROXY') or os.getenv('https_proxy')  
-        self.no_proxy = os.getenv('NO_PROXY') or os.getenv('no_proxy')
+        self.http_proxy = env.get('HTTP_PROXY') or env.get('http_proxy')
+        self.https_proxy = env.get('HTTPS_PROXY') or env.get('https_proxy')  
+        self.no_proxy = env.get('NO_PROXY') or env.get('no_proxy')
+        
+        # 批量通知接口单次请求内的最大并发发送数
+        self.batch_max_concurrency = int(env.get("BATCH_MAX_CONCURRENCY", "10"))
+        # 批量通知接口单次请求允许的最大消息条数（超出返回422）
+        self.batch_max_items = int(env.get("BATCH_MAX_ITEMS", "100"))
+        # 批量请求中发往同一Telegram群组的最大条数：单chat限流1条/秒，超出会让请求挂起过久（超出返回422）
+        self.batch_max_per_chat = int(env.get("BATCH_MAX_PER_CHAT", "10"))
         
         # SSL证书验证配置 - 用于解决企业网络环境中的证书问题
         # 生产环境应该保持True，开发/测试环境可设置为false
-        ssl_verify_str = os.getenv('VERIFY_SSL', 'true').lower()
-        self.verify_ssl = ssl_verify_str in ('true', '1', 'yes', 'on')
+        self.verify_ssl = env.get('VERIFY_SSL', 'true').lower() in _TRUE_VALUES
+        
+        # 出站请求是否启用HTTP/2（多路复用，一条连接承载多个并发请求）
+        # 代理或网关不兼容HTTP/2时可设置为false回退到HTTP/1.1
+        self.http2_enabled = env.get('HTTP2_ENABLED', 'true').lower() in _TRUE_VALUES
 
 
-def load_settings() -> Settings:
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
     """
-    Load application settings with multi-layer configuration.
+    Load application settings with multi-layer configuration (cached, loaded once).
     Priority: .env > docker-compose environment > env_for_docker defaults
     """
-    # Load base settings
-    settings = Settings()
-    
+    return Settings()
+
+
+def log_settings_summary(settings: Settings):
+    """
+    Log a summary of the loaded configuration.
+    Called after logging is configured, so nothing is logged at import time.
+    """
     # Try to import loguru for logging, but don't fail if it's not available
     try:
         from loguru import logger
@@ -94,9 +141,7 @@ def load_settings() -> Settings:
         # Fallback to print if loguru is not available
         print(f"Configuration loaded - API Port: {settings.api_port}")
         print(f"Log level: {settings.log_level}")
-    
-    return settings
 
 
 # Global settings instance
-settings = load_settings()
\ No newline at end of file
+settings = get_settings()
\ No newline at end of file
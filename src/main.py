@@ -2,21 +2,30 @@
 FastAPI Notification Service
 Main application entry point with loguru logging and multi-layer configuration.
 """
+import asyncio
+import inspect
+import os
 import sys
 from contextlib import asynccontextmanager
+import httpx
 from fastapi import FastAPI
 from loguru import logger
 
-import sys
-import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.config.settings import settings
+from src.config.settings import settings, log_settings_summary
 from src.routers import notifier
+from src.adapters._http import close_clients
+from src.adapters.telegram import telegram_adapter
+from src.adapters.feishu import FeishuAdapter, feishu_adapter
 
 
 def setup_logging():
-    """Configure loguru logging with appropriate format and level."""
+    """Configure loguru logging with appropriate format and level (runs once per process)."""
+    if getattr(setup_logging, "_done", False):
+        return
+    setup_logging._done = True
+    
     # Remove default logger
     logger.remove()
     
@@ -25,23 +34,32 @@ def setup_logging():
         sys.stdout,
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
         level=settings.log_level,
-        colorize=True
+        colorize=True,
+        enqueue=True  # 由后台线程写stdout，请求路径上不做阻塞的终端I/O
     )
     
     # Add file logger for persistent logs in data directory
-    import os
     log_dir = "./data" if os.path.exists("./data") else "./logs"
-    os.makedirs(log_dir, exist_ok=True)
-    logger.add(
-        f"{log_dir}/notify-service.log",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-        level=settings.log_level,
-        rotation="10 MB",
-        retention="7 days",
-        compression="zip"
-    )
+    # 已存在的目录检查自身是否可写，不存在时检查父目录能否创建
+    writable = os.access(log_dir if os.path.exists(log_dir) else ".", os.W_OK)
+    if settings.disable_file_log:
+        logger.info("File logging disabled by DISABLE_FILE_LOG")
+    elif not writable:
+        logger.warning(f"Log directory {log_dir} is not writable - file logging disabled")
+    else:
+        os.makedirs(log_dir, exist_ok=True)
+        logger.add(
+            f"{log_dir}/notify-service.log",
+            format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+            level=settings.log_level,
+            rotation="10 MB",
+            retention="7 days",
+            compression="zip",
+            enqueue=True  # 在后台线程写入文件，避免磁盘I/O阻塞事件循环
+        )
     
     logger.info(f"Logging configured - Level: {settings.log_level}")
+    log_settings_summary(settings)
 
 
 @asynccontextmanager
@@ -59,20 +77,54 @@ async def lifespan(app: FastAPI):
     
     if settings.feishu_app_id and settings.feishu_app_secret:
         logger.info("Feishu application credentials: CONFIGURED")
-        if settings.feishu_default_user_id:
+        if not settings.feishu_default_user_id:
+            logger.warning("Feishu default user ID: NOT CONFIGURED - require receive_id in API requests")
+        elif FeishuAdapter.is_valid_user_id(settings.feishu_default_user_id):
             logger.info("Feishu default user ID: CONFIGURED")
         else:
-            logger.warning("Feishu default user ID: NOT CONFIGURED - require receive_id in API requests")
+            # 请求中的receive_id由路由参数校验；配置的默认值在启动时检查，尽早暴露配置错误
+            logger.error("Feishu default user ID: INVALID - must be a 10-20 digit number, "
+                         "requests without receive_id will fail")
     else:
         logger.error("Feishu application credentials: NOT CONFIGURED")
         logger.error("⚠️  Feishu API will return 503 errors. Please configure FEISHU_APP_ID and FEISHU_APP_SECRET")
     
+    # 适配器必须是原生异步实现，同步的send_message会阻塞事件循环、拖慢所有请求
+    for name, adapter in (("Telegram", telegram_adapter), ("Feishu", feishu_adapter)):
+        if adapter and not inspect.iscoroutinefunction(adapter.send_message):
+            logger.warning(f"{name} adapter send_message is synchronous and will block the event loop")
+    
+    # 每个上游平台一个专用的连接池客户端，所有请求复用（keep-alive，避免每次TCP+TLS握手）
+    # Telegram的发送与长轮询（getUpdates等）使用独立连接池，避免长连接占满池导致发送排队超时
+    if telegram_adapter:
+        app.state.tg_send = telegram_adapter.create_client(
+            settings.telegram_send_pool_size,
+            timeout=httpx.Timeout(30.0, pool=settings.telegram_pool_timeout)
+        )
+        app.state.tg_poll = telegram_adapter.create_client(4, timeout=None)
+    else:
+        app.state.tg_send = app.state.tg_poll = None
+    app.state.fs_client = feishu_adapter.create_client(settings.feishu_pool_size)
+    
+    # 每个平台的在途请求数与连接池大小一致，超出时在路由层排队，避免连接池等待超时
+    app.state.tg_sem = asyncio.Semaphore(settings.telegram_send_pool_size)
+    app.state.fs_sem = asyncio.Semaphore(settings.feishu_pool_size)
+    
     logger.success("=== Service startup completed ===")
     
     yield
     
     # Shutdown
     logger.info("=== Service shutting down ===")
+    
+    # 关闭各平台专用客户端及适配器共享的HTTP客户端，释放连接池
+    for client in (app.state.tg_send, app.state.tg_poll, app.state.fs_client):
+        if client is not None:
+            await client.aclose()
+    await close_clients()
+    
+    # 等待队列中的日志写入完成
+    await logger.complete()
 
 
 # Configure logging before creating app
@@ -86,6 +138,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# 健康检查使用原生ASGI端点（预序列化字节），排在路由表最前，探活请求最先匹配；
+# 原生端点不生成OpenAPI文档，README中已说明
+app.add_route("/notifier/health", notifier.health_endpoint, methods=["GET"], include_in_schema=False)
+
 # Include routers
 app.include_router(notifier.router)
 
@@ -121,11 +177,19 @@ def main():
     """Main entry point for the notification service."""
     import uvicorn
     
-    logger.info(f"Starting Notification Service on port {settings.api_port}")
+    # uvloop（基于libuv）显著提升事件循环性能，httptools为C实现的HTTP解析器
+    # Windows不支持uvloop；也可通过FAST_IO=false回退到纯Python实现（便于排查问题）
+    fast_io = settings.fast_io and sys.platform != "win32"
+    loop = "uvloop" if fast_io else "asyncio"
+    http = "httptools" if fast_io else "h11"
+    
+    logger.info(f"Starting Notification Service on port {settings.api_port} (event loop: {loop}, http: {http})")
     uvicorn.run(
         "src.main:app",
         host="0.0.0.0",
         port=settings.api_port,
+        loop=loop,
+        http=http,
         reload=False,  # Disable reload in production
         log_config=None  # Use loguru instead of uvicorn logging
     )
@@ -0,0 +1,92 @@
+"""
+Client-side rate limiting for outbound Telegram sends.
+Telegram allows roughly 30 messages/second per bot and 1 message/second per chat;
+queueing briefly on our side is far cheaper than a 429 and its retry_after penalty.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class AsyncTokenBucket:
+    """
+    异步令牌桶：任意 burst/rate 秒的时间窗口内最多放行 burst 次。
+
+    使用 maxlen=burst 的 deque 记录最近的放行时间点，满时只需检查最早的一个，O(1)。
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate: 每秒补充的令牌数
+            burst: 桶容量（允许的瞬时突发数）
+        """
+        self._window = burst / rate
+        self._stamps: Deque[float] = deque(maxlen=burst)
+        self._lock: Optional[asyncio.Lock] = None  # 首次acquire时创建，确保绑定到运行中的事件循环
+        self._pending = 0  # 正在acquire（含排队等待）的调用数
+
+    def idle(self, now: float) -> bool:
+        """无等待者且最近一次放行已超出时间窗口时返回True，此时丢弃该桶不影响限流结果。"""
+        return self._pending == 0 and (not self._stamps or self._stamps[-1] + self._window <= now)
+
+    async def acquire(self):
+        """等待直到可以放行一次请求。等待者按到达顺序依次放行。"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        self._pending += 1
+        try:
+            async with self._lock:
+                now = time.monotonic()
+                if len(self._stamps) == self._stamps.maxlen:
+                    wait = self._stamps[0] + self._window - now
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                        now = time.monotonic()
+                self._stamps.append(now)
+        finally:
+            self._pending -= 1
+
+
+class TelegramRateLimiter:
+    """Telegram发送限流：全局桶 + 每个chat一个桶。"""
+
+    GLOBAL_RATE = 30.0
+    GLOBAL_BURST = 30
+    PER_CHAT_RATE = 1.0
+    PER_CHAT_BURST = 1
+
+    # 空闲chat桶的清理间隔（秒）；group_id来自调用方，不清理会无限增长
+    PRUNE_INTERVAL = 60.0
+
+    def __init__(self):
+        self._global = AsyncTokenBucket(self.GLOBAL_RATE, self.GLOBAL_BURST)
+        self._per_chat: Dict[int, AsyncTokenBucket] = {}
+        self._next_prune = time.monotonic() + self.PRUNE_INTERVAL
+
+    def _prune_idle(self, now: float):
+        """丢弃所有空闲的chat桶。"""
+        idle = [chat for chat, bucket in self._per_chat.items() if bucket.idle(now)]
+        for chat in idle:
+            del self._per_chat[chat]
+        self._next_prune = now + self.PRUNE_INTERVAL
+
+    async def acquire(self, group_id: int):
+        """
+        为发往group_id的一条消息获取发送许可。
+
+        先等待chat级许可再占用全局许可，避免排队中的单个chat占住全局配额。
+        """
+        now = time.monotonic()
+        if now >= self._next_prune:
+            self._prune_idle(now)
+        bucket = self._per_chat.get(group_id)
+        if bucket is None:
+            bucket = self._per_chat[group_id] = AsyncTokenBucket(self.PER_CHAT_RATE, self.PER_CHAT_BURST)
+        await bucket.acquire()
+        await self._global.acquire()
+
+
+# Global Telegram limiter shared by all endpoints
+telegram_limiter = TelegramRateLimiter()
@@ -2,23 +2,213 @@
 FastAPI router for notification endpoints.
 Provides organized API routes for sending messages to various platforms.
 """
-from typing import Optional
+import asyncio
+import hashlib
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Annotated, Any, AsyncIterator, Awaitable, Callable, Dict, Final, List, Literal, Optional
+import httpx
+import orjson
 from fastapi import APIRouter, HTTPException, Request, Query, Body
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from loguru import logger
+from pydantic import BaseModel, Field, StringConstraints, model_validator
 
 from ..adapters.telegram import telegram_adapter, TelegramAdapter
 from ..adapters.feishu import feishu_adapter
 from ..config.settings import settings
+from ._ratelimit import telegram_limiter
 
 
 # Create the notifier router
-router = APIRouter(prefix="/notifier", tags=["notifier"])
+# 接口返回的dict统一由orjson序列化（直接输出bytes，比标准库json快）
+router = APIRouter(prefix="/notifier", tags=["notifier"], default_response_class=ORJSONResponse)
+
+# 平台配置在运行期间不会变化，导入时校验一次，请求路径上只做属性读取
+TELEGRAM_READY: bool = bool(telegram_adapter and telegram_adapter.validate_config())
+FEISHU_READY: bool = bool(settings.feishu_app_id and settings.feishu_app_secret)
+
+# 消息文本：去除首尾空白后不能为空，校验在pydantic-core中完成（不合法时返回422）
+MessageText = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+# Telegram单条消息上限4096字符
+TELEGRAM_MAX_LENGTH: Final[int] = 4096
+TelegramText = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=TELEGRAM_MAX_LENGTH)]
+# 飞书用户ID：10-20位ASCII数字
+RECEIVE_ID_PATTERN = r"^[0-9]{10,20}$"
+# 未提供请求体时的默认消息（默认值不经过校验，直接原样传给适配器）
+DEFAULT_MESSAGE: Final[str] = "你好"
+
+
+class BatchItem(BaseModel):
+    """批量通知中的单条消息。"""
+    platform: Literal["telegram", "feishu"] = Field(description="Target platform")
+    message_text: MessageText = Field(description="Message text content")
+    group_id: Optional[int] = Field(default=None, description="Telegram group ID (telegram only)")
+    receive_id: Optional[str] = Field(default=None, pattern=RECEIVE_ID_PATTERN,
+                                      description="Feishu user ID (feishu only, 10-20 digit number format)")
+
+    @model_validator(mode="after")
+    def _check_telegram_length(self) -> "BatchItem":
+        """Telegram消息与单条接口一致，超过4096字符时返回422而不是交给上游报错。"""
+        if self.platform == "telegram" and len(self.message_text) > TELEGRAM_MAX_LENGTH:
+            raise ValueError(f"Telegram message_text must be at most {TELEGRAM_MAX_LENGTH} characters")
+        return self
+
+
+def _app_client(request: Request, name: str) -> Optional[httpx.AsyncClient]:
+    """获取应用lifespan中创建的平台专用客户端；未启用lifespan时返回None，适配器回退到共享客户端。"""
+    return getattr(request.app.state, name, None)
+
+
+@asynccontextmanager
+async def _upstream_slot(request: Request, name: str) -> AsyncIterator[None]:
+    """
+    占用lifespan中创建的平台级并发槽位（大小与连接池一致），满时在此排队而不是堆积到连接池上。
+    未启用lifespan时不限制。
+    """
+    semaphore: Optional[asyncio.Semaphore] = getattr(request.app.state, name, None)
+    if semaphore is None:
+        yield
+        return
+    async with semaphore:
+        yield
+
+
+async def _send_telegram(request: Request, message_text: str, group_id: int) -> Dict[str, Any]:
+    """通过Telegram适配器发送，使用应用的发送连接池及并发限制。"""
+    async with _upstream_slot(request, "tg_sem"):
+        return await telegram_adapter.send_message(
+            message_text, group_id, client=_app_client(request, "tg_send")
+        )
+
+
+async def _send_feishu(request: Request, message_text: str, receive_id: Optional[str]) -> Dict[str, Any]:
+    """通过飞书适配器发送（凭证与默认用户ID取自配置），使用应用的连接池及并发限制。"""
+    async with _upstream_slot(request, "fs_sem"):
+        return await feishu_adapter.send_message(
+            app_id=settings.feishu_app_id,
+            app_secret=settings.feishu_app_secret,
+            message=message_text,
+            receive_id=receive_id,
+            default_user_id=settings.feishu_default_user_id,
+            client=_app_client(request, "fs_client")
+        )
+
+
+def _safe2(d: Dict[str, Any], k1: str, k2: str) -> Any:
+    """读取d[k1][k2]，任一层缺失（或不是dict）时返回None，不创建临时空dict。"""
+    inner = d.get(k1)
+    return inner.get(k2) if isinstance(inner, dict) else None
+
+
+def _telegram_response(group_id: int, result: Dict[str, Any]) -> Dict[str, Any]:
+    """将Telegram API响应转换为接口返回结构。"""
+    return {
+        "status": "success",
+        "platform": "telegram",
+        "group_id": group_id,
+        "message_id": _safe2(result, "result", "message_id"),
+        "timestamp": _safe2(result, "result", "date")
+    }
+
+
+def _feishu_response(receive_id: Optional[str], result: Dict[str, Any]) -> Dict[str, Any]:
+    """将飞书API响应转换为接口返回结构。"""
+    return {
+        "status": "success",
+        "platform": "feishu",
+        "app_id": settings.feishu_app_id,
+        "receive_id": receive_id,
+        "message_id": _safe2(result, "data", "message_id"),
+        "timestamp": _safe2(result, "data", "create_time")
+    }
+
+
+@dataclass(frozen=True)
+class PlatformHandler:
+    """单个平台的发送流程配置，单条接口与批量接口共用。"""
+    name: str                   # 日志与错误信息中使用的平台名
+    ready: bool                 # 启动时确定的配置是否完整
+    sender: Callable[[Request, str, Any], Awaitable[Dict[str, Any]]]
+    response_builder: Callable[[Any, Dict[str, Any]], Dict[str, Any]]
+    missing_config_detail: str  # 未配置时503的错误信息
+    target_field: str           # BatchItem中的目标字段名
+    default_target: Any         # 未指定目标时使用的配置默认值
+    throttle: Optional[Callable[[Any], Awaitable[None]]] = None  # 发送前的限流（在并发槽位之外等待）
+
+
+DISPATCH: Dict[str, PlatformHandler] = {
+    "telegram": PlatformHandler(
+        name="Telegram",
+        ready=TELEGRAM_READY,
+        sender=_send_telegram,
+        response_builder=_telegram_response,
+        missing_config_detail="Telegram service not configured or unavailable",
+        target_field="group_id",
+        default_target=settings.telegram_default_group_id,
+        # 客户端限流（全局30条/秒，单chat 1条/秒），以短暂排队代替触发429
+        throttle=telegram_limiter.acquire
+    ),
+    "feishu": PlatformHandler(
+        name="Feishu",
+        ready=FEISHU_READY,
+        sender=_send_feishu,
+        response_builder=_feishu_response,
+        missing_config_detail="Feishu service not configured. Please check FEISHU_APP_ID and FEISHU_APP_SECRET environment variables.",
+        target_field="receive_id",
+        default_target=settings.feishu_default_user_id
+    ),
+}
+
+
+async def _notify(platform: str, message_text: str, target: Any, request: Request,
+                  slot: Optional[asyncio.Semaphore] = None) -> Dict[str, Any]:
+    """
+    单条消息的通用发送流程：检查配置 → 限流 → 调用适配器 → 构建返回结构。
+    
+    Args:
+        platform: DISPATCH中的平台名
+        message_text: 已校验的消息文本
+        target: 目标群组/用户ID，None时由适配器使用配置中的默认值
+        request: 当前请求（用于获取应用级客户端和并发槽位）
+        slot: 额外的并发限制（批量接口的单次请求并发数）
+    
+    Raises:
+        HTTPException: 未配置（503）、参数错误（400）或发送失败（500）
+    """
+    handler = DISPATCH[platform]
+    if not handler.ready:
+        raise HTTPException(status_code=503, detail=handler.missing_config_detail)
+    
+    # 实际目标，用于限流、日志与返回结构
+    resolved = target if target is not None else handler.default_target
+    
+    try:
+        if handler.throttle is not None:
+            await handler.throttle(resolved)
+        
+        if slot is None:
+            result = await handler.sender(request, message_text, target)
+        else:
+            async with slot:
+                result = await handler.sender(request, message_text, target)
+    except ValueError as e:
+        # 处理参数验证错误，返回400状态码
+        logger.error("Invalid {platform} message parameters: {}", e, platform=handler.name)
+        raise HTTPException(status_code=400, detail=f"Invalid parameters: {str(e)}")
+    except Exception as e:
+        logger.error("Failed to send {platform} message: {}", e, platform=handler.name)
+        raise HTTPException(status_code=500, detail=f"Failed to send {handler.name} message: {str(e)}")
+    
+    # 成功日志由适配器输出（含platform、目标与耗时），此处不再重复记录
+    return handler.response_builder(resolved, result)
 
 
 @router.post("/notify_telegram")
 async def notify_telegram(
-    message_text: str = Body("你好", media_type="text/plain", description="Message text content"),
+    request: Request,
+    message_text: Annotated[TelegramText, Body(media_type="text/plain", description="Message text content")] = DEFAULT_MESSAGE,
     group_id: int = Query(default=settings.telegram_default_group_id, description="Telegram group ID")
 ):
     """
@@ -31,48 +221,16 @@ async def notify_telegram(
     Returns:
         Telegram API响应结果，包含消息发送状态和相关信息
     """
-    logger.info(f"Received Telegram notification request for group {group_id}")
-    
-    try:
-        # 验证消息内容不为空
-        message_text = message_text.strip()
-        
-        if not message_text:
-            raise HTTPException(status_code=400, detail="Message content is required")
-        
-        # Validate Telegram configuration
-        if not telegram_adapter or not telegram_adapter.validate_config():
-            raise HTTPException(
-                status_code=503, 
-                detail="Telegram service not configured or unavailable"
-            )
-        
-        # Send message via Telegram adapter
-        result = await telegram_adapter.send_message(message_text, group_id)
-        
-        logger.success(f"Telegram message sent successfully to group {group_id}")
-        return {
-            "status": "success",
-            "platform": "telegram",
-            "group_id": group_id,
-            "message_id": result.get("result", {}).get("message_id"),
-            "timestamp": result.get("result", {}).get("date")
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Failed to send Telegram message: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to send Telegram message: {str(e)}"
-        )
+    logger.info("Received Telegram notification request for group {group_id}", group_id=group_id)
+    return await _notify("telegram", message_text, group_id, request)
 
 
 @router.post("/notify_feishu")
 async def notify_feishu(
-    message_text: str = Body("你好", media_type="text/plain", description="Message text content"),
-    receive_id: Optional[str] = Query(default=None, description="Target user ID (optional, 10-20 digit number format)")
+    request: Request,
+    message_text: Annotated[MessageText, Body(media_type="text/plain", description="Message text content")] = DEFAULT_MESSAGE,
+    receive_id: Optional[str] = Query(default=None, pattern=RECEIVE_ID_PATTERN,
+                                      description="Target user ID (optional, 10-20 digit number format)")
 ):
     """
     Send a text message via Feishu (Lark) API.
@@ -89,74 +247,87 @@ async def notify_feishu(
         - receive_id格式要求：必须是10-20位数字格式的用户ID (如: 6421712345678901234)
         - ID优先级：receive_id参数 > FEISHU_DEFAULT_USER_ID配置 > 返回错误
     """
-    # 验证Feishu应用配置是否完整（在API启动时应已验证）
-    if not settings.feishu_app_id or not settings.feishu_app_secret:
-        raise HTTPException(
-            status_code=503,
-            detail="Feishu service not configured. Please check FEISHU_APP_ID and FEISHU_APP_SECRET environment variables."
-        )
-    
-    # 确定实际使用的接收方ID，优先使用传入的receive_id参数
-    actual_receive_id = receive_id or settings.feishu_default_user_id
-    target_for_log = actual_receive_id or "NOT_SET"
-    logger.info(f"Received Feishu notification request for receive_id: {target_for_log}")
-    
-    try:
-        
-        # 验证消息内容不为空
-        message_text = message_text.strip()
-        if not message_text:
-            raise HTTPException(status_code=400, detail="Message content is required")
-        
-        # 通过飞书适配器发送消息，使用改进的ID处理逻辑
-        result = await feishu_adapter.send_message(
-            app_id=settings.feishu_app_id,
-            app_secret=settings.feishu_app_secret,
-            message=message_text,
-            receive_id=receive_id,
-            default_user_id=settings.feishu_default_user_id
-        )
-        
-        logger.success(f"Feishu message sent successfully to {actual_receive_id}")
-        
-        return {
-            "status": "success",
-            "platform": "feishu",
-            "app_id": settings.feishu_app_id,
-            "receive_id": actual_receive_id,
-            "message_id": result.get("data", {}).get("message_id"),
-            "timestamp": result.get("data", {}).get("create_time")
-        }
-        
-    except ValueError as e:
-        # 处理参数验证错误，返回400状态码
-        logger.error(f"Invalid Feishu message parameters: {str(e)}")
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid parameters: {str(e)}"
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Failed to send Feishu message: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to send Feishu message: {str(e)}"
-        )
+    logger.info("Received Feishu notification request for receive_id: {receive_id}",
+                receive_id=receive_id or settings.feishu_default_user_id or "NOT_SET")
+    return await _notify("feishu", message_text, receive_id, request)
 
 
-@router.get("/health")
-async def health_check():
+@router.post("/notify_batch")
+async def notify_batch(
+    request: Request,
+    items: Annotated[List[BatchItem], Body(min_length=1, max_length=settings.batch_max_items)]
+):
     """
-    Health check endpoint for monitoring service status.
+    Send multiple messages to Telegram and/or Feishu in a single request.
     
-    Returns service configuration and adapter status.
+    Args:
+        items: 消息列表，每项包含platform、message_text，以及可选的group_id/receive_id
+    
+    Returns:
+        汇总结果及逐条结果（顺序与请求一致），单条失败不影响其他消息
+    
+    Note:
+        - 单次最多BATCH_MAX_ITEMS条（默认100），超出返回422
+        - 发往同一Telegram群组的消息最多BATCH_MAX_PER_CHAT条（默认10），超出返回422；
+          单chat限流为1条/秒，不限制时整个请求会被挂起到客户端/代理超时之后
+        - 所有消息并发发送，并发数受BATCH_MAX_CONCURRENCY限制（默认10）
+        - 未指定group_id/receive_id时使用配置文件中的默认值
     """
+    logger.info("Received batch notification request with {count} items", count=len(items))
+    
+    default_group = DISPATCH["telegram"].default_target
+    per_chat = Counter(item.group_id if item.group_id is not None else default_group
+                       for item in items if item.platform == "telegram")
+    if per_chat:
+        group_id, count = per_chat.most_common(1)[0]
+        if count > settings.batch_max_per_chat:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Too many messages for Telegram group {group_id}: {count} > BATCH_MAX_PER_CHAT "
+                       f"({settings.batch_max_per_chat}); Telegram allows 1 message/second per chat"
+            )
+    
+    semaphore = asyncio.Semaphore(settings.batch_max_concurrency)
+    outcomes = await asyncio.gather(
+        *(_notify(item.platform, item.message_text, getattr(item, DISPATCH[item.platform].target_field),
+                  request, semaphore) for item in items),
+        return_exceptions=True
+    )
+    
+    results = []
+    for item, outcome in zip(items, outcomes):
+        if isinstance(outcome, BaseException):
+            # 单条失败转换为与单条接口一致的错误结构（状态码 + 错误信息）
+            if isinstance(outcome, HTTPException):
+                status_code, detail = outcome.status_code, outcome.detail
+            else:
+                status_code, detail = 500, f"Failed to send {DISPATCH[item.platform].name} message: {str(outcome)}"
+            results.append({"status": "error", "platform": item.platform, "status_code": status_code, "detail": detail})
+        else:
+            results.append(outcome)
+    
+    succeeded = sum(1 for r in results if r["status"] == "success")
+    failed = len(results) - succeeded
+    if failed:
+        logger.warning("Batch notification finished: {succeeded} sent, {failed} failed",
+                       succeeded=succeeded, failed=failed)
+    else:
+        logger.success("Batch notification finished: {succeeded} sent", succeeded=succeeded)
+    
+    return {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": failed,
+        "results": results
+    }
+
+
+def _build_health_payload() -> Dict[str, Any]:
+    """构建健康检查返回内容，所有字段均来自启动时确定的配置。"""
     telegram_status = "configured" if telegram_adapter else "not_configured"
     
     # Feishu状态检查：需要app_id和app_secret都配置才算完整
-    feishu_configured = bool(settings.feishu_app_id and settings.feishu_app_secret)
-    feishu_status = "configured" if feishu_configured else "not_configured"
+    feishu_status = "configured" if FEISHU_READY else "not_configured"
     
     # 检查Feishu默认用户ID配置状态
     feishu_default_configured = bool(settings.feishu_default_user_id)
@@ -171,11 +342,59 @@ async def health_check():
         },
         "configuration": {
             "telegram_default_group": settings.telegram_default_group_id,
-            "feishu_credentials_configured": feishu_configured,
+            "feishu_credentials_configured": FEISHU_READY,
             "feishu_default_user_configured": feishu_default_configured
         },
         "api_changes": {
             "notify_feishu": "Now uses environment configuration for app_id/app_secret, only requires receive_id parameter",
             "both_endpoints": "Added default message body value '你好'"
         }
-    }
\ No newline at end of file
+    }
+
+
+# 健康检查内容在运行期间不变：导入时序列化一次，并计算ETag供监控方使用条件请求
+# （md5仅用作内容指纹，声明usedforsecurity=False以免在FIPS模式的主机上导入失败）
+_HEALTH_BYTES = orjson.dumps(_build_health_payload())
+_HEALTH_ETAG = f'"{hashlib.md5(_HEALTH_BYTES, usedforsecurity=False).hexdigest()}"'.encode()
+
+# 预先构建好的ASGI响应消息，请求时直接发送
+_HEALTH_START = {
+    "type": "http.response.start",
+    "status": 200,
+    "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(_HEALTH_BYTES)).encode()),
+        (b"etag", _HEALTH_ETAG),
+    ],
+}
+_HEALTH_BODY = {"type": "http.response.body", "body": _HEALTH_BYTES}
+_HEALTH_NOT_MODIFIED = {
+    "type": "http.response.start",
+    "status": 304,
+    "headers": [(b"etag", _HEALTH_ETAG)],
+}
+_EMPTY_BODY = {"type": "http.response.body", "body": b""}
+
+
+class HealthEndpoint:
+    """
+    Health check endpoint for monitoring service status (/notifier/health).
+    
+    Returns service configuration and adapter status.
+    Supports If-None-Match: a matching ETag yields 304 Not Modified.
+    
+    以原生ASGI应用实现，由主应用直接注册为路由：不经过FastAPI的参数解析、
+    依赖注入和响应类处理，探活请求只发送预先构建好的字节。
+    """
+    
+    async def __call__(self, scope, receive, send):
+        for name, value in scope["headers"]:
+            if name == b"if-none-match" and value == _HEALTH_ETAG:
+                await send(_HEALTH_NOT_MODIFIED)
+                await send(_EMPTY_BODY)
+                return
+        await send(_HEALTH_START)
+        await send(_HEALTH_BODY)
+
+
+health_endpoint = HealthEndpoint()
@@ -0,0 +1,27 @@
+"""
+Shared pytest fixtures.
+Environment is set before the app is imported so that settings and the
+global adapters pick it up; no real network calls are made by the tests.
+"""
+import os
+import sys
+
+os.environ.setdefault("DISABLE_FILE_LOG", "true")
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:test-token")
+os.environ.setdefault("FEISHU_APP_ID", "cli_test")
+os.environ.setdefault("FEISHU_APP_SECRET", "test-secret")
+os.environ.setdefault("FEISHU_DEFAULT_USER_ID", "6421712345678901234")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+
+@pytest.fixture
+def client():
+    """TestClient with the application lifespan running."""
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,19 @@
+"""Tests for the raw ASGI health endpoint."""
+HEALTH_URL = "/notifier/health"
+
+
+def test_health_returns_payload_with_etag(client):
+    response = client.get(HEALTH_URL)
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+    assert response.headers["etag"].startswith('"')
+
+
+def test_health_matching_etag_returns_304(client):
+    etag = client.get(HEALTH_URL).headers["etag"]
+
+    response = client.get(HEALTH_URL, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
@@ -0,0 +1,39 @@
+"""Tests for the shared HTTP client helpers."""
+import certifi
+import pytest
+
+from src.adapters import _http
+
+
+@pytest.fixture
+def fresh_ssl_context():
+    """Rebuild the cached SSLContext around each test."""
+    _http._default_ssl_context.cache_clear()
+    yield _http._default_ssl_context
+    _http._default_ssl_context.cache_clear()
+
+
+def _first_pem_cert(bundle_path):
+    pem = open(bundle_path, encoding="ascii").read()
+    end = "-----END CERTIFICATE-----"
+    return pem[pem.index("-----BEGIN CERTIFICATE-----"):pem.index(end) + len(end)] + "\n"
+
+
+def test_ssl_context_respects_ssl_cert_file(tmp_path, monkeypatch, fresh_ssl_context):
+    ca_file = tmp_path / "corporate-ca.pem"
+    ca_file.write_text(_first_pem_cert(certifi.where()))
+    monkeypatch.setenv("SSL_CERT_FILE", str(ca_file))
+    monkeypatch.delenv("SSL_CERT_DIR", raising=False)
+
+    assert len(fresh_ssl_context().get_ca_certs()) == 1
+
+
+def test_ssl_context_defaults_to_certifi_bundle(monkeypatch, fresh_ssl_context):
+    monkeypatch.delenv("SSL_CERT_FILE", raising=False)
+    monkeypatch.delenv("SSL_CERT_DIR", raising=False)
+
+    assert len(fresh_ssl_context().get_ca_certs()) > 1
+
+
+def test_ssl_context_is_built_once(fresh_ssl_context):
+    assert fresh_ssl_context() is fresh_ssl_context()
@@ -0,0 +1,180 @@
+"""Tests for the single-message endpoints with a mocked upstream."""
+import dataclasses
+
+import httpx
+import orjson
+import pytest
+
+from src.config.settings import settings
+from src.routers import notifier
+
+TELEGRAM_URL = "/notifier/notify_telegram"
+FEISHU_URL = "/notifier/notify_feishu"
+TEXT_HEADERS = {"Content-Type": "text/plain"}
+
+
+class FakeUpstream:
+    """Mock Telegram/Feishu APIs; records every request and can be told to fail."""
+
+    def __init__(self):
+        self.requests = []
+        self.telegram_error = None  # (status, description) to return instead of success
+        self.feishu_error = None    # (status, msg)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        path = request.url.path
+        if request.url.host == "api.telegram.org":
+            if self.telegram_error:
+                status, description = self.telegram_error
+                return httpx.Response(status, content=orjson.dumps({"ok": False, "description": description}))
+            return httpx.Response(200, content=orjson.dumps(
+                {"ok": True, "result": {"message_id": 42, "date": 1700000000}}))
+        if path.endswith("/tenant_access_token/internal"):
+            return httpx.Response(200, content=orjson.dumps(
+                {"code": 0, "tenant_access_token": "t-test", "expire": 7200}))
+        if self.feishu_error:
+            status, msg = self.feishu_error
+            return httpx.Response(status, content=orjson.dumps({"code": 230001, "msg": msg}))
+        return httpx.Response(200, content=orjson.dumps(
+            {"code": 0, "data": {"message_id": "om_1", "create_time": "1700000000"}}))
+
+    def sent(self, host):
+        """JSON bodies of the message requests sent to host."""
+        return [orjson.loads(r.content) for r in self.requests
+                if r.url.host == host and "tenant_access_token" not in r.url.path]
+
+
+@pytest.fixture
+def upstream(client, monkeypatch):
+    """Route the app's platform clients to a FakeUpstream."""
+    fake = FakeUpstream()
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handle))
+    monkeypatch.setattr(client.app.state, "tg_send", mock_client)
+    monkeypatch.setattr(client.app.state, "fs_client", mock_client)
+    return fake
+
+
+@pytest.fixture
+def throttled(monkeypatch):
+    """Replace the Telegram limiter with a recorder so tests do not wait on it."""
+    targets = []
+
+    async def record(target):
+        targets.append(target)
+
+    handler = dataclasses.replace(notifier.DISPATCH["telegram"], throttle=record)
+    monkeypatch.setitem(notifier.DISPATCH, "telegram", handler)
+    return targets
+
+
+def _replace_handler(monkeypatch, platform, **changes):
+    monkeypatch.setitem(notifier.DISPATCH, platform, dataclasses.replace(notifier.DISPATCH[platform], **changes))
+
+
+def test_telegram_success(client, upstream, throttled):
+    response = client.post(TELEGRAM_URL, params={"group_id": -100}, content="deploy done", headers=TEXT_HEADERS)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "status": "success", "platform": "telegram", "group_id": -100,
+        "message_id": 42, "timestamp": 1700000000,
+    }
+    assert upstream.sent("api.telegram.org") == [{"chat_id": -100, "text": "deploy done", "parse_mode": "HTML"}]
+    assert throttled == [-100]
+
+
+def test_feishu_success(client, upstream):
+    response = client.post(FEISHU_URL, params={"receive_id": "1234567890"}, content="deploy done",
+                           headers=TEXT_HEADERS)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "status": "success", "platform": "feishu", "app_id": settings.feishu_app_id,
+        "receive_id": "1234567890", "message_id": "om_1", "timestamp": "1700000000",
+    }
+    sent = upstream.sent("open.feishu.cn")
+    assert len(sent) == 1
+    assert sent[0]["receive_id"] == "1234567890"
+    assert sent[0]["content"] == {"text": "deploy done"}
+
+
+def test_default_body_and_targets(client, upstream, throttled):
+    telegram = client.post(TELEGRAM_URL)
+    feishu = client.post(FEISHU_URL)
+
+    assert telegram.status_code == 200
+    assert telegram.json()["group_id"] == settings.telegram_default_group_id
+    assert feishu.status_code == 200
+    assert feishu.json()["receive_id"] == settings.feishu_default_user_id
+    assert upstream.sent("api.telegram.org")[0]["text"] == notifier.DEFAULT_MESSAGE == "你好"
+    assert upstream.sent("open.feishu.cn")[0]["content"] == {"text": "你好"}
+
+
+@pytest.mark.parametrize("url, platform", [(TELEGRAM_URL, "telegram"), (FEISHU_URL, "feishu")])
+def test_unconfigured_platform_returns_503(client, upstream, monkeypatch, url, platform):
+    _replace_handler(monkeypatch, platform, ready=False)
+
+    response = client.post(url, content="hi", headers=TEXT_HEADERS)
+
+    assert response.status_code == 503
+    assert response.json()["detail"] == notifier.DISPATCH[platform].missing_config_detail
+    assert upstream.requests == []
+
+
+@pytest.mark.parametrize("url", [TELEGRAM_URL, FEISHU_URL])
+def test_blank_body_returns_422(client, upstream, url):
+    response = client.post(url, content="   ", headers=TEXT_HEADERS)
+
+    assert response.status_code == 422
+    assert upstream.requests == []
+
+
+def test_telegram_message_over_limit_returns_422(client, upstream, throttled):
+    limit = notifier.TELEGRAM_MAX_LENGTH
+
+    assert client.post(TELEGRAM_URL, content="x" * limit, headers=TEXT_HEADERS).status_code == 200
+    assert client.post(TELEGRAM_URL, content="x" * (limit + 1), headers=TEXT_HEADERS).status_code == 422
+    assert len(upstream.sent("api.telegram.org")) == 1
+
+
+@pytest.mark.parametrize("receive_id", ["12", "12345abcde", "123456789012345678901"])
+def test_bad_receive_id_returns_422(client, upstream, receive_id):
+    response = client.post(FEISHU_URL, params={"receive_id": receive_id}, content="hi", headers=TEXT_HEADERS)
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["query", "receive_id"]
+    assert upstream.requests == []
+
+
+@pytest.mark.parametrize("url, platform", [(TELEGRAM_URL, "telegram"), (FEISHU_URL, "feishu")])
+def test_value_error_returns_400(client, monkeypatch, url, platform):
+    async def invalid(request, message_text, target):
+        raise ValueError("bad target")
+
+    _replace_handler(monkeypatch, platform, sender=invalid, throttle=None)
+
+    response = client.post(url, content="hi", headers=TEXT_HEADERS)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid parameters: bad target"
+
+
+def test_telegram_upstream_error_returns_500(client, upstream, throttled):
+    upstream.telegram_error = (400, "Bad Request: chat not found")
+
+    response = client.post(TELEGRAM_URL, content="hi", headers=TEXT_HEADERS)
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Failed to send Telegram message: Telegram API error: Bad Request: chat not found"
+    assert len(upstream.sent("api.telegram.org")) == 1  # 4xx is not retried
+
+
+def test_feishu_upstream_error_returns_500(client, upstream):
+    upstream.feishu_error = (400, "invalid receive_id")
+
+    response = client.post(FEISHU_URL, content="hi", headers=TEXT_HEADERS)
+
+    assert response.status_code == 500
+    assert response.json()["detail"].startswith("Failed to send Feishu message:")
+    assert "invalid receive_id" in response.json()["detail"]
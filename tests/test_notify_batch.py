@@ -0,0 +1,176 @@
+"""Tests for POST /notifier/notify_batch with stubbed platform senders."""
+import asyncio
+import dataclasses
+
+import pytest
+
+from src.config.settings import settings
+from src.routers import notifier
+
+BATCH_URL = "/notifier/notify_batch"
+
+
+def _stub_platform(monkeypatch, platform, sender=None, **overrides):
+    """Replace a DISPATCH entry with a stubbed sender (throttling disabled)."""
+    handler = dataclasses.replace(notifier.DISPATCH[platform], throttle=None, **overrides)
+    if sender is not None:
+        handler = dataclasses.replace(handler, sender=sender)
+    monkeypatch.setitem(notifier.DISPATCH, platform, handler)
+
+
+async def _telegram_ok(request, message_text, group_id):
+    return {"ok": True, "result": {"message_id": 1, "date": 1700000000}}
+
+
+async def _feishu_ok(request, message_text, receive_id):
+    return {"code": 0, "data": {"message_id": f"om_{receive_id}", "create_time": "1700000000"}}
+
+
+def test_mixed_success_and_failure_preserves_order(client, monkeypatch):
+    async def telegram_sender(request, message_text, group_id):
+        # 先发出的请求后完成，验证结果顺序与请求顺序一致而非完成顺序
+        await asyncio.sleep(0.05 if group_id == -1 else 0)
+        if message_text == "boom":
+            raise Exception("upstream exploded")
+        return await _telegram_ok(request, message_text, group_id)
+
+    _stub_platform(monkeypatch, "telegram", telegram_sender)
+    _stub_platform(monkeypatch, "feishu", _feishu_ok)
+
+    response = client.post(BATCH_URL, json=[
+        {"platform": "telegram", "message_text": "first", "group_id": -1},
+        {"platform": "feishu", "message_text": "second", "receive_id": "1234567890"},
+        {"platform": "telegram", "message_text": "boom", "group_id": -3},
+        {"platform": "telegram", "message_text": "fourth", "group_id": -4},
+    ])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["succeeded"], body["failed"]) == (4, 3, 1)
+    results = body["results"]
+    assert [r["platform"] for r in results] == ["telegram", "feishu", "telegram", "telegram"]
+    assert results[0] == {"status": "success", "platform": "telegram", "group_id": -1,
+                          "message_id": 1, "timestamp": 1700000000}
+    assert results[1]["receive_id"] == "1234567890"
+    assert results[1]["message_id"] == "om_1234567890"
+    assert results[2]["status"] == "error"
+    assert results[2]["status_code"] == 500
+    assert "upstream exploded" in results[2]["detail"]
+    assert results[3]["group_id"] == -4
+
+
+def test_defaults_used_when_target_missing(client, monkeypatch):
+    _stub_platform(monkeypatch, "telegram", _telegram_ok)
+    _stub_platform(monkeypatch, "feishu", _feishu_ok)
+
+    response = client.post(BATCH_URL, json=[
+        {"platform": "telegram", "message_text": "hi"},
+        {"platform": "feishu", "message_text": "hi"},
+    ])
+
+    results = response.json()["results"]
+    assert results[0]["group_id"] == settings.telegram_default_group_id
+    assert results[1]["receive_id"] == settings.feishu_default_user_id
+
+
+def test_unconfigured_platform_fails_per_item_with_503(client, monkeypatch):
+    _stub_platform(monkeypatch, "telegram", _telegram_ok)
+    _stub_platform(monkeypatch, "feishu", _feishu_ok, ready=False)
+
+    response = client.post(BATCH_URL, json=[
+        {"platform": "feishu", "message_text": "hi", "receive_id": "1234567890"},
+        {"platform": "telegram", "message_text": "hi", "group_id": -1},
+    ])
+
+    assert response.status_code == 200
+    feishu_result, telegram_result = response.json()["results"]
+    assert feishu_result["status"] == "error"
+    assert feishu_result["status_code"] == 503
+    assert feishu_result["detail"] == notifier.DISPATCH["feishu"].missing_config_detail
+    assert telegram_result["status"] == "success"
+
+
+@pytest.mark.parametrize("receive_id", ["12", "12345678901234567890123", "12345abcde", "１２３４５６７８９０"])
+def test_bad_receive_id_is_rejected_with_422(client, monkeypatch, receive_id):
+    sent = []
+
+    async def feishu_sender(request, message_text, target):
+        sent.append(target)
+        return await _feishu_ok(request, message_text, target)
+
+    _stub_platform(monkeypatch, "feishu", feishu_sender)
+
+    response = client.post(BATCH_URL, json=[
+        {"platform": "feishu", "message_text": "hi", "receive_id": receive_id},
+    ])
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", 0, "receive_id"]
+    assert sent == []
+
+
+def test_blank_message_is_rejected_with_422(client):
+    response = client.post(BATCH_URL, json=[{"platform": "telegram", "message_text": "   "}])
+    assert response.status_code == 422
+
+
+def test_telegram_message_length_is_limited(client, monkeypatch):
+    _stub_platform(monkeypatch, "telegram", _telegram_ok)
+    _stub_platform(monkeypatch, "feishu", _feishu_ok)
+    limit = notifier.TELEGRAM_MAX_LENGTH
+
+    ok = client.post(BATCH_URL, json=[{"platform": "telegram", "message_text": "x" * limit}])
+    assert ok.status_code == 200
+
+    too_long = client.post(BATCH_URL, json=[{"platform": "telegram", "message_text": "x" * (limit + 1)}])
+    assert too_long.status_code == 422
+    assert too_long.json()["detail"][0]["loc"] == ["body", 0]
+
+    # Feishu has no such cap
+    feishu = client.post(BATCH_URL, json=[{"platform": "feishu", "message_text": "x" * (limit + 1)}])
+    assert feishu.status_code == 200
+
+
+def test_batch_size_is_limited(client, monkeypatch):
+    _stub_platform(monkeypatch, "telegram", _telegram_ok)
+
+    def items(count):
+        # distinct groups so that only the total size limit applies
+        return [{"platform": "telegram", "message_text": "hi", "group_id": -i} for i in range(1, count + 1)]
+
+    assert client.post(BATCH_URL, json=items(settings.batch_max_items)).status_code == 200
+    assert client.post(BATCH_URL, json=items(settings.batch_max_items + 1)).status_code == 422
+    assert client.post(BATCH_URL, json=[]).status_code == 422
+
+
+def test_messages_per_telegram_chat_are_limited(client, monkeypatch):
+    sent = []
+
+    async def telegram_sender(request, message_text, group_id):
+        sent.append(group_id)
+        return await _telegram_ok(request, message_text, group_id)
+
+    _stub_platform(monkeypatch, "telegram", telegram_sender)
+    _stub_platform(monkeypatch, "feishu", _feishu_ok)
+    limit = settings.batch_max_per_chat
+    same_chat = [{"platform": "telegram", "message_text": "hi", "group_id": -1}]
+    # Feishu items and the default group (group_id omitted) are counted separately
+    others = [{"platform": "feishu", "message_text": "hi"}] * (limit + 1) + \
+             [{"platform": "telegram", "message_text": "hi"}]
+
+    assert client.post(BATCH_URL, json=same_chat * limit + others).status_code == 200
+    sent.clear()
+
+    response = client.post(BATCH_URL, json=same_chat * (limit + 1))
+    assert response.status_code == 422
+    assert "BATCH_MAX_PER_CHAT" in response.json()["detail"]
+    assert sent == []
+
+
+def test_default_group_counts_towards_per_chat_limit(client, monkeypatch):
+    _stub_platform(monkeypatch, "telegram", _telegram_ok)
+    default_group = {"platform": "telegram", "message_text": "hi", "group_id": settings.telegram_default_group_id}
+    omitted = {"platform": "telegram", "message_text": "hi"}
+
+    response = client.post(BATCH_URL, json=[default_group] * settings.batch_max_per_chat + [omitted])
+    assert response.status_code == 422
@@ -0,0 +1,94 @@
+"""Tests for the client-side Telegram rate limiter."""
+import asyncio
+import time
+
+from src.routers._ratelimit import AsyncTokenBucket, TelegramRateLimiter
+
+
+class _FastLimiter(TelegramRateLimiter):
+    """Short windows so the timing tests stay fast."""
+
+    GLOBAL_RATE = 2.0
+    GLOBAL_BURST = 2        # 1s window
+    PER_CHAT_RATE = 5.0
+    PER_CHAT_BURST = 1      # 0.2s window
+    PRUNE_INTERVAL = 0.0
+
+
+def test_bucket_allows_burst_then_waits_for_window():
+    async def run():
+        bucket = AsyncTokenBucket(rate=10.0, burst=2)  # 0.2s window
+        start = time.monotonic()
+        done = []
+        for _ in range(3):
+            await bucket.acquire()
+            done.append(time.monotonic() - start)
+        return done
+
+    first, second, third = asyncio.run(run())
+    assert first < 0.05
+    assert second < 0.05
+    assert 0.18 <= third < 0.4
+
+
+def test_bucket_releases_waiters_in_arrival_order():
+    async def run():
+        bucket = AsyncTokenBucket(rate=20.0, burst=1)
+        order = []
+
+        async def worker(i):
+            await bucket.acquire()
+            order.append(i)
+
+        await asyncio.gather(*(worker(i) for i in range(5)))
+        return order
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+
+
+def test_waiting_chat_does_not_hold_global_quota():
+    """A chat queued on its own bucket must not block other chats on the global bucket."""
+    async def run():
+        limiter = _FastLimiter()
+        start = time.monotonic()
+        finished = {}
+
+        async def send(label, chat):
+            await limiter.acquire(chat)
+            finished[label] = time.monotonic() - start
+
+        await asyncio.gather(send("a1", 1), send("a2", 1), send("b", 2))
+        return finished
+
+    finished = asyncio.run(run())
+    assert finished["a1"] < 0.05
+    assert finished["b"] < 0.05
+    # a2 waits for chat 1's window, then for the global window taken by a1 and b
+    assert 0.9 <= finished["a2"] < 1.3
+
+
+def test_idle_chat_buckets_are_evicted():
+    async def run():
+        limiter = _FastLimiter()
+        for chat in range(5):
+            await limiter.acquire(chat)
+        await asyncio.sleep(0.25)
+        await limiter.acquire(99)
+        return set(limiter._per_chat)
+
+    assert asyncio.run(run()) == {99}
+
+
+def test_busy_chat_bucket_is_kept():
+    async def run():
+        limiter = _FastLimiter()
+        await limiter.acquire(1)
+        waiting = asyncio.ensure_future(limiter.acquire(1))
+        await asyncio.sleep(0)
+        bucket = limiter._per_chat[1]
+        await limiter.acquire(2)  # triggers pruning while chat 1 still has a waiter
+        kept = limiter._per_chat.get(1) is bucket
+        await waiting
+        return kept
+
+    assert asyncio.run(run())
@@ -0,0 +1,96 @@
+"""Tests for the adapter retry policy, in particular 429 handling."""
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+from src.adapters import _retry
+from src.adapters._http import raise_for_upstream_error
+from src.adapters._retry import RetryAfterError, UnrecoverableError, retry_async
+from src.adapters.feishu import _feishu_post
+from src.adapters.telegram import _telegram_post
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record retry delays instead of actually sleeping."""
+    recorded = []
+
+    async def fake_sleep(delay):
+        recorded.append(delay)
+
+    monkeypatch.setattr(_retry.asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+def _client(*responses):
+    queue = list(responses)
+    return httpx.AsyncClient(transport=httpx.MockTransport(lambda request: queue.pop(0)))
+
+
+def test_retry_after_is_used_as_delay(sleeps):
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RetryAfterError("rate limited", 3.0)
+        return "ok"
+
+    assert asyncio.run(retry_async(flaky, max_retries=3, base_delay=0.5, max_delay=10.0)) == "ok"
+    assert sleeps == [3.0]
+
+
+def test_retry_after_above_max_delay_fails_fast(sleeps):
+    calls = []
+
+    async def limited():
+        calls.append(1)
+        raise RetryAfterError("rate limited", 60.0)
+
+    with pytest.raises(RetryAfterError):
+        asyncio.run(retry_async(limited, max_retries=3, base_delay=0.5, max_delay=10.0))
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_telegram_429_honours_retry_after(sleeps):
+    limited = httpx.Response(429, content=orjson.dumps({
+        "ok": False, "error_code": 429, "description": "Too Many Requests: retry after 2",
+        "parameters": {"retry_after": 2},
+    }))
+    ok = httpx.Response(200, content=orjson.dumps({"ok": True, "result": {"message_id": 1}}))
+
+    async def run():
+        async with _client(limited, ok) as client:
+            return await _telegram_post(client, "https://api.telegram.org/botx/sendMessage", b"{}")
+
+    assert asyncio.run(run())["ok"] is True
+    assert sleeps == [2.0]
+
+
+def test_feishu_429_honours_ratelimit_reset_header(sleeps):
+    limited = httpx.Response(429, headers={"x-ogw-ratelimit-reset": "1"},
+                             content=orjson.dumps({"code": 99991400, "msg": "request trigger frequency limit"}))
+    ok = httpx.Response(200, content=orjson.dumps({"code": 0, "data": {}}))
+
+    async def run():
+        async with _client(limited, ok) as client:
+            return await _feishu_post(client, "https://open.feishu.cn/open-apis/im/v1/messages", b"{}", {})
+
+    assert asyncio.run(run())["code"] == 0
+    assert sleeps == [1.0]
+
+
+@pytest.mark.parametrize("status, retry_after, expected", [
+    (400, None, UnrecoverableError),
+    (404, None, UnrecoverableError),
+    (429, None, Exception),
+    (429, 2.0, RetryAfterError),
+    (503, None, Exception),
+])
+def test_upstream_error_classification(status, retry_after, expected):
+    with pytest.raises(Exception) as excinfo:
+        raise_for_upstream_error(httpx.Response(status), "upstream error", retry_after)
+    assert type(excinfo.value) is expected